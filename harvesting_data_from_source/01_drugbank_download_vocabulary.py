@@ -29,22 +29,32 @@ SOFTWARE.
 
 import os
 import re
+import shutil
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
-response = requests.get("https://go.drugbank.com/releases/latest#open-data")
+# Reuse one connection for the releases page and the vocabulary download
+session = requests.Session()
+session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=8,
+                                      max_retries=Retry(total=3, backoff_factor=0.5)))
+session.headers.update({"User-Agent": "drug-named-entity-recognition", "Accept-Encoding": "gzip"})
 
-re_url = re.compile(r'\bhttps://go.drugbank.com/releases/[a-z0-9-/]+all-drugbank-vocabulary\b')
+response = session.get("https://go.drugbank.com/releases/latest#open-data")
 
-url = re_url.findall(response.text)[0]
+# Search the raw bytes for the first match rather than decoding the whole page to text
+re_url = re.compile(rb'\bhttps://go\.drugbank\.com/releases/[a-z0-9-/]+all-drugbank-vocabulary\b')
+
+url = re_url.search(response.content).group(0).decode('ascii')
 
 tmpfile = "/tmp/tmp.zip"
 print(f"Downloading Drugbank dump from {url} to {tmpfile}...")
-response = requests.get(url)
-response.raise_for_status()  # Raise an exception for bad status codes
-
-with open(tmpfile, 'wb') as f:
-    f.write(response.content)
+with session.get(url, stream=True) as response:
+    response.raise_for_status()  # Raise an exception for bad status codes
+    response.raw.decode_content = True
+    with open(tmpfile, 'wb') as f:
+        shutil.copyfileobj(response.raw, f, length=1024 * 1024)
 
 print(f"Downloaded Drugbank dump from {url} to {tmpfile}.")
 
@@ -35,58 +35,58 @@ import gzip
 import os
 import requests
 import shutil
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# All three files come from the same NCBI host, so keep the connection alive between downloads
+session = requests.Session()
+session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=8,
+                                      max_retries=Retry(total=3, backoff_factor=0.5)))
+session.headers.update({"User-Agent": "drug-named-entity-recognition", "Accept-Encoding": "gzip"})
 
 url_pubchem_mesh = "https://ftp.ncbi.nlm.nih.gov/pubchem/Compound/Extras/CID-MeSH"
 output_file_pubchem_mesh = "CID-MeSH"
 
-# Download MeSH file
-print(f"Downloading Pubchem MeSH dump for SMILES from {url_pubchem_mesh} to {output_file_pubchem_mesh}...")
-response = requests.get(url_pubchem_mesh)
-response.raise_for_status()
-
-with open(output_file_pubchem_mesh, 'wb') as f:
-    f.write(response.content)
-
-print(f"Downloaded Pubchem MeSH dump for SMILES from {url_pubchem_mesh} to {output_file_pubchem_mesh}.")
-
-# Download SMILES file
 url_pubchem_smiles = "https://ftp.ncbi.nlm.nih.gov/pubchem/Compound/Extras/CID-SMILES.gz"
 output_file_pubchem_smiles = "CID-SMILES.gz"
 
-print(f"Downloading Pubchem SMILES data from {url_pubchem_smiles} to {output_file_pubchem_smiles}...")
-response = requests.get(url_pubchem_smiles)
-response.raise_for_status()
-
-with open(output_file_pubchem_smiles, 'wb') as f:
-    f.write(response.content)
-
-print(f"Downloaded Pubchem SMILES data from {url_pubchem_smiles} to {output_file_pubchem_smiles}.")
-
-# Download mass file
 url_pubchem_mass = "https://ftp.ncbi.nlm.nih.gov/pubchem/Compound/Extras/CID-Mass.gz"
 output_file_pubchem_mass = "CID-Mass.gz"
 
-print(f"Downloading Pubchem mass data from {url_pubchem_mass} to {output_file_pubchem_mass}...")
-response = requests.get(url_pubchem_mass)
-response.raise_for_status()
-
-with open(output_file_pubchem_mass, 'wb') as f:
-    f.write(response.content)
-
-print(f"Downloaded Pubchem mass data from {url_pubchem_mass} to {output_file_pubchem_mass}.")
-
-# Unzip SMILES file
-print(f"Unzipping {output_file_pubchem_smiles}...")
-with gzip.open(output_file_pubchem_smiles, 'rb') as f_in:
-    with open(output_file_pubchem_smiles[:-3], 'wb') as f_out:  # Remove .gz extension
-        shutil.copyfileobj(f_in, f_out)
-
-print(f"Unzipped {output_file_pubchem_smiles}.")
-
-# Unzip mass file
-print(f"Unzipping {output_file_pubchem_mass}...")
-with gzip.open(output_file_pubchem_mass, 'rb') as f_in:
-    with open(output_file_pubchem_mass[:-3], 'wb') as f_out:  # Remove .gz extension
-        shutil.copyfileobj(f_in, f_out)
 
-print(f"Unzipped {output_file_pubchem_mass}.")
+def fetch(url, output_file):
+    print(f"Downloading {url} to {output_file}...")
+    # Stream straight to disk so the whole file is never held in memory
+    with session.get(url, stream=True) as response:
+        response.raise_for_status()
+        response.raw.decode_content = True
+        with open(output_file, 'wb') as f:
+            shutil.copyfileobj(response.raw, f, length=1024 * 1024)
+    print(f"Downloaded {url} to {output_file}.")
+
+
+def gunzip(input_file):
+    print(f"Unzipping {input_file}...")
+    if shutil.which("pigz"):  # pigz decompresses using several threads, if it's installed
+        subprocess.run(["pigz", "-d", "-k", "-f", input_file], check=True)
+    else:
+        with gzip.open(input_file, 'rb') as f_in:
+            with open(input_file[:-3], 'wb') as f_out:  # Remove .gz extension
+                shutil.copyfileobj(f_in, f_out, length=128 * 1024)
+    print(f"Unzipped {input_file}.")
+
+
+# The downloads are independent, so run them in parallel and then unzip the two gzipped files in parallel too
+with ThreadPoolExecutor(max_workers=3) as executor:
+    downloads = [executor.submit(fetch, url_pubchem_mesh, output_file_pubchem_mesh),
+                 executor.submit(fetch, url_pubchem_smiles, output_file_pubchem_smiles),
+                 executor.submit(fetch, url_pubchem_mass, output_file_pubchem_mass)]
+    for download in downloads:
+        download.result()  # Re-raise any exception from the download
+
+    unzips = [executor.submit(gunzip, output_file_pubchem_smiles),
+              executor.submit(gunzip, output_file_pubchem_mass)]
+    for unzip in unzips:
+        unzip.result()
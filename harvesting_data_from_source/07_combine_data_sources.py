@@ -27,8 +27,8 @@ SOFTWARE.
 
 '''
 
-import bz2
 import csv
+import gzip
 import json
 import pathlib
 import pickle as pkl
@@ -322,7 +322,7 @@ for term_to_delete in drugs_to_exclude_under_all_variants:
         del drug_variant_to_canonical[variant]
     del drug_canonical_to_data[term_to_delete]
 
-with bz2.open("../src/drug_named_entity_recognition/drug_ner_dictionary.pkl.bz2", "wb") as f:
+with gzip.open("../src/drug_named_entity_recognition/drug_ner_dictionary.pkl.gz", "wb") as f:
     pkl.dump(
         {"drug_variant_to_canonical": drug_variant_to_canonical,
          "drug_canonical_to_data": drug_canonical_to_data,
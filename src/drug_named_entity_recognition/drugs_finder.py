@@ -28,33 +28,46 @@ SOFTWARE.
 
 """
 
-import bz2
+import functools
+import gzip
 import logging
 import os
 import pathlib
 import pickle as pkl
-from collections import Counter
-
-try:
-    from cfuzzyset import cFuzzySet as FuzzySet
-except ImportError:
-    from fuzzyset import FuzzySet
+import re
+import sqlite3
+import threading
+from bisect import bisect_left, bisect_right
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain
 
 from english_words import get_english_words_set
+from rapidfuzz import process
+from rapidfuzz.distance import Levenshtein
 
-from drug_named_entity_recognition.molecular_properties import (
-    get_molecular_weight,
-)
+from drug_named_entity_recognition import molecular_properties
+from drug_named_entity_recognition.molecular_properties import apply_pub_chem_properties, get_molecular_weight
 from drug_named_entity_recognition.omop_api import get_omop_id_from_drug
 from drug_named_entity_recognition.structure_file_downloader import download_structures
 from drug_named_entity_recognition.util import stopwords
 
 logger = logging.getLogger(__name__)
 
+# Number of threads used to call the PubChem and OMOP APIs in find_drugs
+API_MAX_WORKERS = 16
+
 dbid_to_mol_lookup = {}
+structures_lock = threading.Lock()
+is_structures_load_attempted = False
+is_structures_loaded = False
+
+re_structure_separator = re.compile(r"^\$\$\$\$.*\n?", re.MULTILINE)
+re_drugbank_id_line = re.compile(r"^DB.*$", re.MULTILINE)
 
 this_path = pathlib.Path(__file__).parent.resolve()
-with bz2.open(this_path.joinpath("drug_ner_dictionary.pkl.bz2"), "rb") as f:
+# Stored gzipped rather than bz2 as gzip decompresses roughly ten times faster at import
+with gzip.open(this_path.joinpath("drug_ner_dictionary.pkl.gz"), "rb") as f:
     d = pkl.load(f)
 
 home_path = pathlib.Path.home()
@@ -62,22 +75,45 @@ structures_folder = home_path.joinpath(".drug_names")
 structures_file = structures_folder.joinpath("open structures.sdf")
 
 # Caching setup
-CACHE_FILE = home_path.joinpath(".omop_cache.pkl")
-if os.path.exists(CACHE_FILE):
-    with open(CACHE_FILE, "rb") as f:
-        omop_cache = pkl.load(f)
-else:
-    omop_cache = {}
+CACHE_FILE = home_path.joinpath(".omop_cache.sqlite")
+
+
+def connect_omop_cache(cache_file):
+    # SQLite lets each new lookup be written as a single row instead of rewriting the whole cache
+    conn = sqlite3.connect(str(cache_file), isolation_level=None, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("CREATE TABLE IF NOT EXISTS omop(name TEXT PRIMARY KEY, id TEXT)")
+    return conn
+
+
+# Opened on the first OMOP lookup, so importing the library never touches the home directory
+omop_cache_conn = None
+omop_cache_lock = threading.Lock()
+
+
+def get_omop_cache_conn():
+    """Return the OMOP cache connection, opening it if needed. Call with omop_cache_lock held."""
+    global omop_cache_conn
+
+    if omop_cache_conn is None:
+        try:
+            omop_cache_conn = connect_omop_cache(CACHE_FILE)
+        except sqlite3.Error as e:
+            logger.warning("Could not open OMOP cache %s (%s). Caching in memory instead.", CACHE_FILE, e)
+            omop_cache_conn = connect_omop_cache(":memory:")
+    return omop_cache_conn
 
 
 def cached_get_omop_id(drug_name):
     name = drug_name.lower()
-    if name in omop_cache:
-        return omop_cache[name]
+    with omop_cache_lock:
+        row = get_omop_cache_conn().execute("SELECT id FROM omop WHERE name=?", (name,)).fetchone()
+    if row is not None:
+        return row[0]
     omop_id = get_omop_id_from_drug(name)
-    omop_cache[name] = omop_id
-    with open(CACHE_FILE, "wb") as f:
-        pkl.dump(omop_cache, f)
+    with omop_cache_lock:
+        get_omop_cache_conn().execute("INSERT OR REPLACE INTO omop(name, id) VALUES (?, ?)", (name, omop_id))
     return omop_id
 
 
@@ -86,28 +122,30 @@ drug_canonical_to_data = {}
 drug_variant_to_variant_data = {}
 ngram_to_variant = {}
 variant_to_ngrams = {}
+# First word of every multi-word variant, so find_drugs only builds two-word candidates where one could match
+variant_first_words = set()
 
-# FuzzySet for drug names and English dictionary
-drug_names_fuzzyset = None
-dictionary_fuzzyset = None
+# How far below the wanted score the cutoffs passed to rapidfuzz sit, see extract_best_match
+FUZZY_CUTOFF_MARGIN = 0.001
+# Number of candidates sharing the most trigrams with a surface form that are scored before the full scan
+FUZZY_SHORTLIST_SIZE = 200
 
+# Candidate list for fuzzy matching of drug names, sorted by length, and the length of each
+drug_variants = []
+drug_variant_lengths = []
 
-def get_ngrams(text):
-    n = 3
-    ngrams = set()
-    for i in range(0, len(text) - n + 1, 1):
-        ngrams.add(text[i : i + n])
-    return ngrams
 
+def get_ngrams(text, n=3):
+    return {text[i : i + n] for i in range(len(text) - n + 1)}
 
-def reset_drugs_data():
-    global drug_names_fuzzyset, dictionary_fuzzyset
 
+def reset_drugs_data():
     drug_variant_to_canonical.clear()
     drug_canonical_to_data.clear()
     drug_variant_to_variant_data.clear()
     ngram_to_variant.clear()
     variant_to_ngrams.clear()
+    variant_first_words.clear()
 
     drug_variant_to_canonical.update(d["drug_variant_to_canonical"])
     drug_canonical_to_data.update(d["drug_canonical_to_data"])
@@ -120,48 +158,42 @@ def reset_drugs_data():
                     drug_canonical_to_data[canonical]["synonyms"] = []
                 drug_canonical_to_data[canonical]["synonyms"].append(variant)
 
+    ngram_to_variant_local = defaultdict(list)
     for drug_variant in drug_variant_to_canonical:
         ngrams = get_ngrams(drug_variant)
         variant_to_ngrams[drug_variant] = ngrams
         for ngram in ngrams:
-            if ngram not in ngram_to_variant:
-                ngram_to_variant[ngram] = []
-            ngram_to_variant[ngram].append(drug_variant)
+            ngram_to_variant_local[ngram].append(drug_variant)
+    ngram_to_variant.update(ngram_to_variant_local)
 
-    # Build FuzzySet for drug names
-    drug_names_fuzzyset = FuzzySet()
-    for drug_variant in drug_variant_to_canonical:
-        drug_names_fuzzyset.add(drug_variant.lower())
-    logger.info("Built FuzzySet with %s drug variants", len(drug_variant_to_canonical))
+    variant_first_words.update(variant.split(" ")[0] for variant in drug_variant_to_canonical if " " in variant)
 
-    # Build FuzzySet for English dictionary
-    dictionary_fuzzyset = FuzzySet()
-    for term in get_english_words_set(["web2"], lower=True):
-        dictionary_fuzzyset.add(term)
-    logger.info("Built FuzzySet for English dictionary")
+    drug_variants.clear()
+    drug_variants.extend(sorted(drug_variant_to_canonical, key=len))
+    drug_variant_lengths.clear()
+    drug_variant_lengths.extend(len(drug_variant) for drug_variant in drug_variants)
+    logger.info("Indexed %s drug variants for fuzzy matching", len(drug_variants))
 
 
 def add_custom_drug_synonym(
     drug_variant: str, canonical_name: str, optional_variant_data: dict = None
 ):
-    global drug_names_fuzzyset
-
     drug_variant = drug_variant.lower()
     canonical_name = canonical_name.lower()
+    if drug_variant not in drug_variant_to_canonical:
+        idx = bisect_right(drug_variant_lengths, len(drug_variant))
+        drug_variants.insert(idx, drug_variant)
+        drug_variant_lengths.insert(idx, len(drug_variant))
     drug_variant_to_canonical[drug_variant] = [canonical_name]
+    if " " in drug_variant:
+        variant_first_words.add(drug_variant.split(" ")[0])
     if optional_variant_data is not None and len(optional_variant_data) > 0:
         drug_variant_to_variant_data[drug_variant] = optional_variant_data
 
     ngrams = get_ngrams(drug_variant)
     variant_to_ngrams[drug_variant] = ngrams
     for ngram in ngrams:
-        if ngram not in ngram_to_variant:
-            ngram_to_variant[ngram] = []
-        ngram_to_variant[ngram].append(drug_variant)
-
-    # Add to FuzzySet if it exists
-    if drug_names_fuzzyset is not None:
-        drug_names_fuzzyset.add(drug_variant)
+        ngram_to_variant.setdefault(ngram, []).append(drug_variant)
 
     return f"Added {drug_variant} as a synonym for {canonical_name}. Optional data attached to this synonym = {optional_variant_data}"
 
@@ -175,8 +207,6 @@ def add_custom_new_drug(drug_name, drug_data):
 
 
 def remove_drug_synonym(drug_variant: str):
-    global drug_names_fuzzyset
-
     drug_variant = drug_variant.lower()
     ngrams = get_ngrams(drug_variant)
 
@@ -189,15 +219,101 @@ def remove_drug_synonym(drug_variant: str):
         if ngram in ngram_to_variant:
             ngram_to_variant[ngram].remove(drug_variant)
 
-    # Note: FuzzySet doesn't support removal, so we'd need to rebuild it
-    # For now, we'll just note that removal won't affect FuzzySet until reset_drugs_data() is called
-    # In practice, this is acceptable since removals are rare
+    idx = drug_variants.index(
+        drug_variant, bisect_left(drug_variant_lengths, len(drug_variant)),
+        bisect_right(drug_variant_lengths, len(drug_variant))
+    )
+    del drug_variants[idx]
+    del drug_variant_lengths[idx]
 
     return f"Removed {drug_variant} from dictionary"
 
 
+@functools.lru_cache(maxsize=1)
+def get_dictionary_words():
+    """Load the English dictionary used to reject fuzzy matches, on first use.
+
+    Only fuzzy matching needs it, so exact-match users never pay for loading it.
+
+    Returns:
+        Tuple of (list of words sorted by length, length of each word, frozenset of the words for exact lookups,
+        dict of trigram to the words containing it)
+    """
+    words = sorted(get_english_words_set(["web2"], lower=True), key=lambda word: (len(word), word))
+    ngram_to_word = defaultdict(list)
+    for word in words:
+        for ngram in get_ngrams(word):
+            ngram_to_word[ngram].append(word)
+    logger.info("Loaded %s English dictionary words for fuzzy matching", len(words))
+    return words, [len(word) for word in words], frozenset(words), dict(ngram_to_word)
+
+
+def extract_best_match(surface_form: str, candidates, score_cutoff: float):
+    """Best match among candidates by normalised Levenshtein similarity, or None if none reaches score_cutoff.
+
+    rapidfuzz turns a normalised cutoff into a whole edit distance with float rounding, which can reject a
+    candidate scoring exactly the cutoff, so rapidfuzz gets a slightly lower cutoff and the check is done here.
+    """
+    result = process.extractOne(
+        surface_form, candidates, scorer=Levenshtein.normalized_similarity,
+        score_cutoff=max(0.0, score_cutoff - FUZZY_CUTOFF_MARGIN)
+    )
+    if result is None or result[1] < score_cutoff:
+        return None
+    return result[0], result[1]
+
+
+def get_best_fuzzy_match(
+    surface_form: str, candidates: list, candidate_lengths: list, ngram_index: dict, score_cutoff: float,
+    is_any_match: bool = False
+):
+    """Best match for surface form among candidates, the same as scoring every candidate but much faster.
+
+    The candidates sharing the most trigrams with the surface form are scored first, and the best of them raises
+    the cutoff. Then only candidates that could still reach the cutoff are scored: n edits can remove at most
+    3 * n of the surface form's trigrams, and reaching a similarity s takes at least |len(a) - len(b)| edits.
+
+    Args:
+        surface_form: The lowercased text to match
+        candidates: Candidates sorted by length
+        candidate_lengths: Length of each candidate
+        ngram_index: Trigram to the candidates containing it
+        score_cutoff: Minimum similarity score (0-1) for a match
+        is_any_match: Return the first match found that reaches score_cutoff, rather than the best one
+
+    Returns:
+        Tuple of (candidate, similarity_score) or None if no candidate reaches score_cutoff
+    """
+    ngrams = get_ngrams(surface_form)
+    shared_ngram_counts = Counter(chain.from_iterable(ngram_index.get(ngram, ()) for ngram in ngrams))
+    shortlist = [candidate for candidate, _ in shared_ngram_counts.most_common(FUZZY_SHORTLIST_SIZE)]
+    shortlist_result = extract_best_match(surface_form, shortlist, score_cutoff)
+    if shortlist_result is not None:
+        if is_any_match:
+            return shortlist_result
+        score_cutoff = shortlist_result[1]
+
+    length_cutoff = score_cutoff - FUZZY_CUTOFF_MARGIN
+    if length_cutoff <= 0:
+        return extract_best_match(surface_form, candidates, score_cutoff)
+    max_length = len(surface_form) / length_cutoff
+    min_shared_ngrams = len(ngrams) - 3 * int((1 - length_cutoff) * max_length)
+    if min_shared_ngrams > 0:
+        # Sorted so that ties go the same way on every run, whatever order the trigram set iterates in
+        remaining = sorted(
+            (candidate for candidate, count in shared_ngram_counts.items() if count >= min_shared_ngrams),
+            key=lambda candidate: (len(candidate), candidate)
+        )
+    else:
+        remaining = candidates[
+            bisect_left(candidate_lengths, length_cutoff * len(surface_form)):
+            bisect_right(candidate_lengths, max_length)
+        ]
+    return extract_best_match(surface_form, remaining, score_cutoff) or shortlist_result
+
+
 def get_fuzzy_match(surface_form: str, fuzzy_threshold: float = 0.5):
-    """Find fuzzy match for surface form using FuzzySet, excluding common English words.
+    """Find fuzzy match for surface form using rapidfuzz, excluding common English words.
 
     Args:
         surface_form: The text to match against drug names
@@ -206,35 +322,105 @@ def get_fuzzy_match(surface_form: str, fuzzy_threshold: float = 0.5):
     Returns:
         Tuple of (matched_variant, similarity_score) or (None, None) if no match found
     """
-    if drug_names_fuzzyset is None or dictionary_fuzzyset is None:
-        logger.warning("FuzzySets not initialized. Call reset_drugs_data() first.")
+    if not drug_variants:
+        logger.warning("Fuzzy matching data not initialized. Call reset_drugs_data() first.")
         return None, None
 
+    dictionary_words, dictionary_word_lengths, dictionary_word_set, ngram_to_word = get_dictionary_words()
     surface_form_lower = surface_form.lower()
 
-    # Try to find in drug_names FuzzySet
-    drug_results = drug_names_fuzzyset.get(surface_form_lower)
-    if not drug_results:
+    # An exact dictionary word would score 1.0 against the dictionary and so always be excluded below
+    if surface_form_lower in dictionary_word_set:
         return None, None
 
-    best_score, best_match = drug_results[0]
-
-    # Check if score meets threshold
-    if best_score < fuzzy_threshold:
+    # Normalised Levenshtein similarity is the score FuzzySet used, so thresholds keep their old meaning
+    drug_result = get_best_fuzzy_match(
+        surface_form_lower, drug_variants, drug_variant_lengths, ngram_to_variant, fuzzy_threshold
+    )
+    if drug_result is None:
         return None, None
 
-    # Check if it's a common English word in the dictionary
-    dict_results = dictionary_fuzzyset.get(surface_form_lower)
-    is_dict_word = dict_results and dict_results[0][0] >= best_score
+    best_match, best_score = drug_result
+
+    # Check if it's close to a common English word, e.g. a plural missing from the dictionary. Any word scoring
+    # at least as well as the drug is enough to exclude it
+    dict_result = get_best_fuzzy_match(
+        surface_form_lower, dictionary_words, dictionary_word_lengths, ngram_to_word, best_score, is_any_match=True
+    )
 
     # If it's a dictionary word with higher or equal score, exclude it
-    if is_dict_word:
+    if dict_result is not None:
         return None, None
 
     # Return the matched variant and score
     return best_match, best_score
 
 
+def parse_structures(sdf_text: str) -> dict:
+    """Split the contents of a DrugBank structures SDF file into one MOL block per DrugBank ID.
+
+    Each block is kept up to and including its DrugBank ID line, without the DRUGBANK_ID property header.
+    """
+    lookup = {}
+    for block in re_structure_separator.split(sdf_text):
+        match = re_drugbank_id_line.search(block)
+        if match:
+            lines = block[: match.end() + 1].splitlines(keepends=True)
+            lookup[match.group(0).strip()] = "".join(line for line in lines if "DRUGBANK_ID" not in line)
+    return lookup
+
+
+def load_structures():
+    """Download (if needed) and parse the structures file into dbid_to_mol_lookup, once per process."""
+    global is_structures_load_attempted, is_structures_loaded
+
+    with structures_lock:
+        if is_structures_load_attempted:
+            return
+        # Set before downloading so that a failed download is not retried on every call
+        is_structures_load_attempted = True
+        if not os.path.exists(structures_file):
+            structures_folder.mkdir(parents=True, exist_ok=True)
+            download_structures(structures_folder)
+
+        dbid_to_mol_lookup.update(parse_structures(structures_file.read_text(encoding="utf-8")))
+        # Only set once the lookup is filled, so other threads wait on the lock rather than skip the load
+        is_structures_loaded = True
+
+
+def enrich_matches(drug_matches, lookup_names, is_use_omop_api, use_pub_chem_api):
+    """Add molecular weight and OMOP ID to each match, calling the external APIs concurrently.
+
+    Each distinct drug name is looked up only once, however many times it was matched.
+
+    Args:
+        drug_matches: List of (match_data, start, end) tuples, modified in place
+        lookup_names: Name to look up in the APIs for each entry of drug_matches
+        is_use_omop_api: Whether to look up the OMOP ID of each match
+        use_pub_chem_api: Whether to fetch molecular weight from PubChem when it can't be calculated from the formula
+    """
+    for (match_data, _, _), lookup_name in zip(drug_matches, lookup_names):
+        get_molecular_weight(match_data, lookup_name)
+
+    pub_chem_names = set()
+    if use_pub_chem_api:
+        pub_chem_names = {lookup_name for (match_data, _, _), lookup_name in zip(drug_matches, lookup_names)
+                          if "molecular_weight" not in match_data}
+    omop_names = set(lookup_names) if is_use_omop_api else set()
+    if not pub_chem_names and not omop_names:
+        return
+
+    with ThreadPoolExecutor(max_workers=API_MAX_WORKERS) as executor:
+        pub_chem_futures = {name: executor.submit(molecular_properties.fetch_pub_chem_properties, name) for name in pub_chem_names}
+        omop_futures = {name: executor.submit(cached_get_omop_id, name) for name in omop_names}
+
+    for (match_data, _, _), lookup_name in zip(drug_matches, lookup_names):
+        if lookup_name in pub_chem_futures and "molecular_weight" not in match_data:
+            apply_pub_chem_properties(match_data, pub_chem_futures[lookup_name].result())
+        if is_use_omop_api:
+            match_data["omop_id"] = omop_futures[lookup_name].result()
+
+
 def find_drugs(
     tokens: list,
     is_fuzzy_match=False,
@@ -243,120 +429,102 @@ def find_drugs(
     is_use_omop_api=False,
     use_pub_chem_api=False,
 ):
-    if is_include_structure and len(dbid_to_mol_lookup) == 0:
-        dbid_to_mol_lookup["downloading"] = True
-        if not os.path.exists(structures_file):
-            structures_folder.mkdir(parents=True, exist_ok=True)
-            download_structures(structures_folder)
-
-        is_in_structure = True
-        current_structure = ""
-        with open(structures_file, "r", encoding="utf-8") as f:
-            for l in f:
-                if is_in_structure and "DRUGBANK_ID" not in l:
-                    current_structure += l
-                if l.startswith("DB"):
-                    dbid_to_mol_lookup[l.strip()] = current_structure
-                    current_structure = ""
-                    is_in_structure = False
-                if l.startswith("$$$$"):
-                    is_in_structure = True
+    if is_include_structure and not is_structures_loaded:
+        load_structures()
 
     drug_matches = []
+    lookup_names = []
     is_exclude = set()
 
+    # Lower-case each token and check it against the stopwords once, rather than in both passes
+    lowered = [token.lower() for token in tokens]
+    is_stopword = [token in stopwords for token in lowered]
+    variant_to_canonical_get = drug_variant_to_canonical.get
+    canonical_to_data_get = drug_canonical_to_data.get
+    variant_to_variant_data_get = drug_variant_to_variant_data.get
+
+    # Fuzzy matching is by far the most expensive step and documents repeat the same words, so score each
+    # distinct candidate only once per call
+    fuzzy_matches = {}
+
+    def get_fuzzy_match_once(surface_form):
+        if surface_form not in fuzzy_matches:
+            fuzzy_matches[surface_form] = get_fuzzy_match(surface_form)
+        return fuzzy_matches[surface_form]
+
     for token_idx, token in enumerate(tokens[:-1]):
-        next_token = tokens[token_idx + 1]
-        cand = token + " " + next_token
-        cand_norm = cand.lower()
+        if not is_fuzzy_match and lowered[token_idx] not in variant_first_words:
+            continue
+        cand_norm = lowered[token_idx] + " " + lowered[token_idx + 1]
 
-        match = drug_variant_to_canonical.get(cand_norm, None)
+        match = variant_to_canonical_get(cand_norm, None)
         if match:
+            # The original-case string is only needed for a match, so don't build it for every pair
+            cand = token + " " + tokens[token_idx + 1]
             for m in match:
-                match_data = dict(
-                    drug_canonical_to_data.get(m, {})
-                ) | drug_variant_to_variant_data.get(cand_norm, {})
-                match_data["match_similarity"] = 1.0
-                match_data["matching_string"] = cand
-                lookup_name = match_data.get("name", m)
-
-                match_data = get_molecular_weight(
-                    match_data, lookup_name, use_pub_chem_api
-                )
-
-                if is_use_omop_api:
-                    match_data["omop_id"] = cached_get_omop_id(lookup_name)
+                match_data = {
+                    **canonical_to_data_get(m, {}),
+                    **variant_to_variant_data_get(cand_norm, {}),
+                    "match_similarity": 1.0,
+                    "matching_string": cand,
+                }
+                lookup_names.append(match_data.get("name", m))
                 drug_matches.append((match_data, token_idx, token_idx + 2))
             is_exclude.update([token_idx, token_idx + 1])
 
         elif is_fuzzy_match:
-            if token.lower() not in stopwords and next_token.lower() not in stopwords:
-                fuzzy_matched_variant, similarity = get_fuzzy_match(cand_norm)
+            if not is_stopword[token_idx] and not is_stopword[token_idx + 1]:
+                fuzzy_matched_variant, similarity = get_fuzzy_match_once(cand_norm)
                 if fuzzy_matched_variant is not None:
+                    cand = token + " " + tokens[token_idx + 1]
                     match = drug_variant_to_canonical[fuzzy_matched_variant]
                     for m in match:
-                        match_data = dict(
-                            drug_canonical_to_data.get(m, {})
-                        ) | drug_variant_to_variant_data.get(fuzzy_matched_variant, {})
-                        match_data["match_similarity"] = similarity
-                        match_data["match_variant"] = fuzzy_matched_variant
-                        match_data["matching_string"] = cand
-                        lookup_name = match_data.get("name", m)
-
-                        match_data = get_molecular_weight(
-                            match_data, lookup_name, use_pub_chem_api
-                        )
-
-                        if is_use_omop_api: 
-                            match_data["omop_id"] = cached_get_omop_id(lookup_name)
+                        match_data = {
+                            **canonical_to_data_get(m, {}),
+                            **variant_to_variant_data_get(fuzzy_matched_variant, {}),
+                            "match_similarity": similarity,
+                            "match_variant": fuzzy_matched_variant,
+                            "matching_string": cand,
+                        }
+                        lookup_names.append(match_data.get("name", m))
                         drug_matches.append((match_data, token_idx, token_idx + 2))
                         is_exclude.update([token_idx, token_idx + 1])
 
     for token_idx, token in enumerate(tokens):
         if token_idx in is_exclude:
             continue
-        cand_norm = token.lower()
-        match = drug_variant_to_canonical.get(cand_norm, None)
+        cand_norm = lowered[token_idx]
+        match = variant_to_canonical_get(cand_norm, None)
         if match:
             for m in match:
-                match_data = dict(
-                    drug_canonical_to_data.get(m, {})
-                ) | drug_variant_to_variant_data.get(cand_norm, {})
-                match_data["match_similarity"] = 1.0
-                match_data["matching_string"] = token
-                lookup_name = match_data.get("name", m)
-
-                match_data = get_molecular_weight(
-                    match_data, lookup_name, use_pub_chem_api
-                )
-
-                if is_use_omop_api:
-                    match_data["omop_id"] = cached_get_omop_id(lookup_name)
+                match_data = {
+                    **canonical_to_data_get(m, {}),
+                    **variant_to_variant_data_get(cand_norm, {}),
+                    "match_similarity": 1.0,
+                    "matching_string": token,
+                }
+                lookup_names.append(match_data.get("name", m))
                 drug_matches.append((match_data, token_idx, token_idx + 1))
                 is_exclude.add(token_idx)
         elif is_fuzzy_match:
-            if cand_norm not in stopwords and len(cand_norm) > 3:
-                fuzzy_matched_variant, similarity = get_fuzzy_match(cand_norm)
+            if not is_stopword[token_idx] and len(cand_norm) > 3:
+                fuzzy_matched_variant, similarity = get_fuzzy_match_once(cand_norm)
                 if fuzzy_matched_variant is not None:
                     match = drug_variant_to_canonical[fuzzy_matched_variant]
                     for m in match:
-                        match_data = dict(
-                            drug_canonical_to_data.get(m, {})
-                        ) | drug_variant_to_variant_data.get(fuzzy_matched_variant, {})
-                        match_data["match_similarity"] = similarity
-                        match_data["match_variant"] = fuzzy_matched_variant
-                        match_data["matching_string"] = token
-                        lookup_name = match_data.get("name", m)
-
-                        match_data = get_molecular_weight(
-                            match_data, lookup_name, use_pub_chem_api
-                        )
-
-                        if is_use_omop_api:
-                            match_data["omop_id"] = cached_get_omop_id(lookup_name)
+                        match_data = {
+                            **canonical_to_data_get(m, {}),
+                            **variant_to_variant_data_get(fuzzy_matched_variant, {}),
+                            "match_similarity": similarity,
+                            "match_variant": fuzzy_matched_variant,
+                            "matching_string": token,
+                        }
+                        lookup_names.append(match_data.get("name", m))
                         drug_matches.append((match_data, token_idx, token_idx + 1))
                         is_exclude.add(token_idx)
 
+    enrich_matches(drug_matches, lookup_names, is_use_omop_api, use_pub_chem_api)
+
     if is_include_structure:
         for match in drug_matches:
             match_data = match[0]
@@ -32,6 +32,11 @@ import re
 from typing import Dict, Optional, Tuple, Union
 
 import requests
+from requests.adapters import HTTPAdapter
+
+# Shared session so that concurrent lookups from find_drugs reuse kept-alive connections
+session = requests.Session()
+session.mount("https://", HTTPAdapter(pool_maxsize=16))
 
 # * IUPAC 2023 atomic weights for all elements
 ATOMIC_WEIGHTS = {
@@ -165,7 +170,7 @@ def fetch_pub_chem_properties(
     """
     url = f"https://pubchem.ncbi.nlm.nih.gov/rest/pug/compound/name/{drug_name}/property/MolecularWeight,CanonicalSMILES/JSON"
     try:
-        response = requests.get(url, timeout=10)
+        response = session.get(url, timeout=10)
         if response.ok:
             props = response.json()["PropertyTable"]["Properties"][0]
             # * Return as strings to preserve exact formatting from API
@@ -190,6 +195,19 @@ def calculate_molecular_weight(formula: str) -> float:
     return round(weight, 2)
 
 
+def apply_pub_chem_properties(
+    match_data: dict, pub_chem_properties: Tuple[Optional[float], Optional[str]]
+) -> Dict:
+    """
+    Fills in 'molecular_weight' from a (MolecularWeight, CanonicalSMILES) result of fetch_pub_chem_properties.
+    Modifies match_data in place.
+    """
+    mw, _ = pub_chem_properties
+    if mw:
+        match_data["molecular_weight"] = round(mw, 2)
+    return match_data
+
+
 def get_molecular_weight(
     match_data: dict, lookup_name: str, use_pub_chem_api=False
 ) -> Dict:
@@ -210,8 +228,6 @@ def get_molecular_weight(
 
     # * Fetch from PubChem if still missing molecular_weight
     if "molecular_weight" not in match_data and use_pub_chem_api:
-        mw, _ = fetch_pub_chem_properties(lookup_name)
-        if mw:
-            match_data["molecular_weight"] = round(mw, 2)
+        apply_pub_chem_properties(match_data, fetch_pub_chem_properties(lookup_name))
 
     return match_data
@@ -29,6 +29,11 @@ SOFTWARE.
 '''
 
 import requests
+from requests.adapters import HTTPAdapter
+
+# Reused across lookups, including concurrent ones from find_drugs, so requests to RxNav keep the connection alive
+session = requests.Session()
+session.mount("https://", HTTPAdapter(pool_maxsize=16))
 
 # Local cache
 omop_cache = {}
@@ -39,7 +44,7 @@ def get_rxcui(drug_name):
 
     try:
         url = f"https://rxnav.nlm.nih.gov/REST/rxcui.json?name={drug_name}"
-        response = requests.get(url)
+        response = session.get(url)
         rxnorm_ids = response.json().get("idGroup", {}).get("rxnormId")
         omop_id = rxnorm_ids[0] if rxnorm_ids else None
         omop_cache[drug_name] = omop_id  
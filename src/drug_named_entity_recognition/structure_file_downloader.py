@@ -43,9 +43,9 @@ def download_structures(this_path):
     if not temp_mirror_url:
         response = requests.get("https://go.drugbank.com/releases/latest#open-data")
 
-        re_url = re.compile(r'\bhttps://go.drugbank.com/releases/[a-z0-9-/]+all-open-structures\b')
+        re_url = re.compile(rb'\bhttps://go\.drugbank\.com/releases/[a-z0-9-/]+all-open-structures\b')
 
-        url = re_url.findall(response.text)[0]
+        url = re_url.search(response.content).group(0).decode('ascii')
     else:
         url = temp_mirror_url
 
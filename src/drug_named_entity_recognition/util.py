@@ -823,3 +823,4 @@ stopwords = {'abbott',
              'zambia',
              'zealand',
              'zimbabwe'}
+stopwords = frozenset(stopwords)
@@ -52,6 +52,27 @@ class TestDrugsFinderModifications(unittest.TestCase):
         self.assertEqual(1, len(drugs))
         self.assertEqual("Sertraline", drugs[0][0]['name'])
 
+    def test_two_word_drug_synonym(self):
+        reset_drugs_data()
+        add_custom_drug_synonym("zorbitrex forte", "sertraline")
+
+        drugs = find_drugs("i bought some Zorbitrex forte".split(" "))
+
+        self.assertEqual(1, len(drugs))
+        self.assertEqual("Sertraline", drugs[0][0]['name'])
+        self.assertEqual(3, drugs[0][1])
+        self.assertEqual(5, drugs[0][2])
+
+    def test_drug_synonym_fuzzy(self):
+        reset_drugs_data()
+        add_custom_drug_synonym("zorbitrex", "sertraline")
+
+        drugs = find_drugs("i bought some zorbitrax".split(" "), is_fuzzy_match=True)
+
+        self.assertEqual(1, len(drugs))
+        self.assertEqual("Sertraline", drugs[0][0]['name'])
+        self.assertEqual("zorbitrex", drugs[0][0]['match_variant'])
+
     def test_completely_new_drug(self):
         reset_drugs_data()
         add_custom_new_drug("potato", {"name": "solanum tuberosum"})
@@ -76,6 +97,15 @@ class TestDrugsFinderModifications(unittest.TestCase):
 
         self.assertEqual(0, len(drugs))
 
+    def test_drug_synonym_fuzzy_absent_after_erasure(self):
+        reset_drugs_data()
+        add_custom_drug_synonym("zorbitrex", "sertraline")
+        remove_drug_synonym("zorbitrex")
+
+        drugs = find_drugs("i bought some zorbitrax".split(" "), is_fuzzy_match=True)
+
+        self.assertNotIn("zorbitrex", [drug[0]['match_variant'] for drug in drugs])
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -29,7 +29,7 @@ SOFTWARE.
 
 import unittest
 
-from drug_named_entity_recognition.drugs_finder import find_drugs
+from drug_named_entity_recognition.drugs_finder import find_drugs, get_fuzzy_match
 
 
 class TestDrugsFinder(unittest.TestCase):
@@ -166,6 +166,19 @@ class TestDrugsFinder(unittest.TestCase):
 
         self.assertEqual(1, len(drugs))
 
+    def test_fuzzy_ignores_plain_english(self):
+        drugs = find_drugs("patient was given 2 tablets of paracetamol daily".split(" "), is_fuzzy_match=True)
+
+        matching_strings = [drug[0]['matching_string'] for drug in drugs]
+        self.assertNotIn("was given", matching_strings)
+        self.assertNotIn("tablets of", matching_strings)
+
+    def test_fuzzy_zero_threshold(self):
+        fuzzy_matched_variant, similarity = get_fuzzy_match("paraxcetamol", fuzzy_threshold=0.0)
+
+        self.assertEqual("paracetamol", fuzzy_matched_variant)
+        self.assertGreater(similarity, 0.9)
+
     def test_restasis(self):
         drugs = find_drugs("i bought some restasis".split(" "), is_include_structure=True)
 
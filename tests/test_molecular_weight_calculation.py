@@ -1,5 +1,6 @@
 import unittest
 from drug_named_entity_recognition.molecular_properties import (
+    apply_pub_chem_properties,
     calculate_molecular_weight,
 )
 
@@ -25,6 +26,13 @@ class TestMolecularWeightCalculation(unittest.TestCase):
                 print("No expected weight provided, just checking weight > 0")
                 self.assertTrue(weight > 0)
 
+    def test_apply_pub_chem_properties(self):
+        match_data = apply_pub_chem_properties({}, (151.163, "CC(=O)NC1=CC=C(C=C1)O"))
+        self.assertEqual(151.16, match_data["molecular_weight"])
+
+        match_data = apply_pub_chem_properties({}, (None, None))
+        self.assertNotIn("molecular_weight", match_data)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,101 @@
+'''
+MIT License
+
+Copyright (c) 2023 Fast Data Science Ltd (https://fastdatascience.com)
+
+Maintainer: Thomas Wood
+
+Tutorial at https://fastdatascience.com/drug-named-entity-recognition-python-library/
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+'''
+
+import unittest
+from unittest.mock import patch
+
+from drug_named_entity_recognition import drugs_finder
+
+
+class TestOmopCache(unittest.TestCase):
+
+    def setUp(self):
+        self.conn = drugs_finder.connect_omop_cache(":memory:")
+
+    def tearDown(self):
+        self.conn.close()
+
+    @patch("drug_named_entity_recognition.drugs_finder.get_omop_id_from_drug")
+    def test_api_called_once_per_name(self, mock_get_omop_id):
+        mock_get_omop_id.return_value = "161"
+
+        with patch.object(drugs_finder, "omop_cache_conn", self.conn):
+            self.assertEqual("161", drugs_finder.cached_get_omop_id("Paracetamol"))
+            self.assertEqual("161", drugs_finder.cached_get_omop_id("paracetamol"))
+
+        mock_get_omop_id.assert_called_once_with("paracetamol")
+
+    @patch("drug_named_entity_recognition.drugs_finder.get_omop_id_from_drug")
+    def test_missing_id_is_cached(self, mock_get_omop_id):
+        mock_get_omop_id.return_value = None
+
+        with patch.object(drugs_finder, "omop_cache_conn", self.conn):
+            self.assertIsNone(drugs_finder.cached_get_omop_id("notadrug"))
+            self.assertIsNone(drugs_finder.cached_get_omop_id("notadrug"))
+
+        mock_get_omop_id.assert_called_once_with("notadrug")
+
+    @patch("drug_named_entity_recognition.drugs_finder.get_omop_id_from_drug")
+    def test_repeated_drug_looked_up_once(self, mock_get_omop_id):
+        mock_get_omop_id.return_value = "161"
+
+        with patch.object(drugs_finder, "omop_cache_conn", self.conn):
+            drugs = drugs_finder.find_drugs("paracetamol then more paracetamol".split(" "), is_use_omop_api=True)
+
+        self.assertEqual(2, len(drugs))
+        self.assertEqual(["161", "161"], [drug[0]["omop_id"] for drug in drugs])
+        mock_get_omop_id.assert_called_once_with("acetaminophen")
+
+    @patch("drug_named_entity_recognition.molecular_properties.fetch_pub_chem_properties")
+    def test_repeated_drug_fetched_from_pub_chem_once(self, mock_fetch):
+        mock_fetch.return_value = (123.456, "C")
+        self.addCleanup(drugs_finder.reset_drugs_data)
+        drugs_finder.add_custom_new_drug("potato", {"name": "solanum tuberosum"})
+
+        drugs = drugs_finder.find_drugs("potato then more potato".split(" "), use_pub_chem_api=True)
+
+        self.assertEqual(2, len(drugs))
+        self.assertEqual([123.46, 123.46], [drug[0]["molecular_weight"] for drug in drugs])
+        mock_fetch.assert_called_once()
+
+    @patch("drug_named_entity_recognition.drugs_finder.get_omop_id_from_drug")
+    def test_unwritable_cache_falls_back_to_memory(self, mock_get_omop_id):
+        mock_get_omop_id.return_value = "161"
+
+        with patch.object(drugs_finder, "omop_cache_conn", None), \
+                patch.object(drugs_finder, "CACHE_FILE", "/nonexistent/dir/.omop_cache.sqlite"):
+            self.assertEqual("161", drugs_finder.cached_get_omop_id("paracetamol"))
+            self.assertEqual("161", drugs_finder.cached_get_omop_id("paracetamol"))
+            drugs_finder.omop_cache_conn.close()
+
+        mock_get_omop_id.assert_called_once_with("paracetamol")
+
+
+if __name__ == "__main__":
+    unittest.main()
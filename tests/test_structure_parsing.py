@@ -0,0 +1,109 @@
+'''
+MIT License
+
+Copyright (c) 2023 Fast Data Science Ltd (https://fastdatascience.com)
+
+Maintainer: Thomas Wood
+
+Tutorial at https://fastdatascience.com/drug-named-entity-recognition-python-library/
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+'''
+
+import pathlib
+import tempfile
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+from drug_named_entity_recognition import drugs_finder
+from drug_named_entity_recognition.drugs_finder import find_drugs, load_structures, parse_structures
+
+SDF_RECORD = """{number}
+  Mrv0541 02231214352D          
+
+  2  1  0  0  0  0            999 V2000
+    2.3645   -2.1409    0.0000 O   0  0  0  0  0  0  0  0  0  0  0  0
+    3.7934    1.1591    0.0000 C   0  0  0  0  0  0  0  0  0  0  0  0
+  1  2  1  0  0  0  0
+M  END
+> <DRUGBANK_ID>
+{drugbank_id}
+
+> <GENERIC_NAME>
+Example
+
+$$$$
+"""
+
+
+class TestStructureParsing(unittest.TestCase):
+
+    def test_one_structure_per_drugbank_id(self):
+        sdf_text = SDF_RECORD.format(number=316, drugbank_id="DB00316") + \
+                   SDF_RECORD.format(number=317, drugbank_id="DB00317")
+
+        lookup = parse_structures(sdf_text)
+
+        self.assertEqual({"DB00316", "DB00317"}, set(lookup))
+        self.assertTrue(lookup["DB00317"].startswith("317\n"))
+        self.assertIn("0.0000 C", lookup["DB00317"])
+        self.assertTrue(lookup["DB00317"].endswith("M  END\nDB00317\n"))
+        self.assertNotIn("DRUGBANK_ID", lookup["DB00317"])
+        self.assertNotIn("GENERIC_NAME", lookup["DB00317"])
+
+    def test_concurrent_find_drugs_waits_for_structures(self):
+        parse_started = threading.Event()
+        release_parse = threading.Event()
+
+        def slow_parse_structures(sdf_text):
+            parse_started.set()
+            release_parse.wait()
+            return parse_structures(sdf_text)
+
+        with tempfile.TemporaryDirectory() as folder:
+            sdf_file = pathlib.Path(folder).joinpath("open structures.sdf")
+            sdf_file.write_text(SDF_RECORD.format(number=316, drugbank_id="DB00316"), encoding="utf-8")
+
+            with patch.object(drugs_finder, "structures_file", sdf_file), \
+                    patch.object(drugs_finder, "is_structures_load_attempted", False), \
+                    patch.object(drugs_finder, "is_structures_loaded", False), \
+                    patch.object(drugs_finder, "parse_structures", slow_parse_structures), \
+                    patch.dict(drugs_finder.dbid_to_mol_lookup, clear=True):
+                loader = threading.Thread(target=load_structures)
+                loader.start()
+                parse_started.wait()
+
+                results = []
+                finder = threading.Thread(
+                    target=lambda: results.append(find_drugs(["paracetamol"], is_include_structure=True))
+                )
+                finder.start()
+                time.sleep(0.2)
+                release_parse.set()
+                loader.join()
+                finder.join()
+
+        self.assertIn("structure_mol", results[0][0][0])
+
+
+if __name__ == "__main__":
+    unittest.main()